@@ -7,8 +7,11 @@
 """
 import os
 import json
+import pathlib
 import logging
+import libkirk
 from libkirk import KirkException
+from libkirk.results import SuiteResults
 
 
 class ExporterError(KirkException):
@@ -42,19 +45,68 @@ class JSONExporter(Exporter):
     def __init__(self) -> None:
         self._logger = logging.getLogger("kirk.json")
 
-    # pylint: disable=too-many-locals
     async def save_file(self, results: list, path: str) -> None:
-        if not results or len(results) == 0:
-            raise ValueError("results is empty")
+        await libkirk.to_thread(self.save_file_sync, results, path)
 
+    def save_file_sync(self, results: list, path: str) -> None:
+        """
+        Blocking version of ``save_file``, which is executed inside a
+        thread, so the event loop is not stalled during report generation.
+        :param results: list of suite results to export.
+        :type results: list(SuiteResults)
+        :param path: path of the file to save.
+        :type path: str
+        """
+        self._check_path(path)
+        self._write_data(self.serialize(results), path)
+
+    async def write_file(self, data: bytes, path: str) -> None:
+        """
+        Write report data created by ``serialize`` into a file. This is
+        useful when the same report has to be saved in multiple paths.
+        :param data: serialized report.
+        :type data: bytes
+        :param path: path of the file to save.
+        :type path: str
+        """
+        self._check_path(path)
+        await libkirk.to_thread(self._write_data, data, path)
+
+    @staticmethod
+    def _check_path(path: str) -> None:
+        """
+        Check if report can be written into ``path``.
+        """
         if not path:
             raise ValueError("path is empty")
 
         if os.path.exists(path):
             raise ExporterError(f"'{path}' already exists")
 
+    def _write_data(self, data: bytes, path: str) -> None:
+        """
+        Write report data into a file.
+        """
         self._logger.info("Exporting JSON report into %s", path)
 
+        pathlib.Path(path).write_bytes(data)
+
+        self._logger.info("Report exported")
+
+    # pylint: disable=too-many-locals
+    def serialize(self, results: list) -> bytes:
+        """
+        Serialize results into JSON report data.
+        :param results: list of suite results to export.
+        :type results: list(SuiteResults)
+        :returns: bytes
+        """
+        if not results or len(results) == 0:
+            raise ValueError("results is empty")
+
+        if any(not isinstance(result, SuiteResults) for result in results):
+            raise ValueError("results must be a list of SuiteResults")
+
         results_json = []
 
         for result in results:
@@ -112,7 +164,4 @@ class JSONExporter(Exporter):
             },
         }
 
-        with open(path, "w+", encoding='UTF-8') as outfile:
-            json.dump(data, outfile, indent=4)
-
-        self._logger.info("Report exported")
+        return json.dumps(data, indent=4).encode(encoding="UTF-8")
@@ -262,19 +262,22 @@ def _start_session(
         """
         Run session then stop events handler.
         """
-        await session.run(
-            command=args.run_command,
-            suites=args.run_suite,
-            report_path=args.json_report
-        )
-        await libkirk.events.stop()
+        try:
+            await session.run(
+                command=args.run_command,
+                suites=args.run_suite,
+                report_path=args.json_report
+            )
+        finally:
+            await libkirk.events.stop()
+            session.stop_debug_log()
 
     try:
         libkirk.run(asyncio.gather(*[
             libkirk.create_task(libkirk.events.start()),
             session_run()
         ]))
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         exit_code = RC_INTERRUPT
     except KirkException:
         exit_code = RC_ERROR
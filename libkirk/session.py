@@ -6,7 +6,11 @@
 .. moduleauthor:: Andrea Cervesato <andrea.cervesato@suse.com>
 """
 import os
+import sys
+import queue
+import typing
 import logging
+import logging.handlers
 import asyncio
 import libkirk
 import libkirk.data
@@ -18,22 +22,123 @@ from libkirk.export import JSONExporter
 from libkirk.scheduler import SuiteScheduler
 
 
+async def _run_tasks(coros: list) -> list:
+    """
+    Run coroutines concurrently and return their results. The first raised
+    exception is propagated to the caller and the remaining coroutines are
+    cancelled.
+    """
+    if sys.version_info >= (3, 11):
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(coro) for coro in coros]
+        # pylint: disable=undefined-variable
+        except ExceptionGroup as err:
+            raise err.exceptions[0] from None
+
+        return [task.result() for task in tasks]
+
+    tasks = [libkirk.create_task(coro) for coro in coros]
+    if not tasks:
+        return []
+
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    for task in tasks:
+        if not task.cancelled() and task.exception():
+            raise task.exception()
+
+    return [task.result() for task in tasks]
+
+
 class RedirectSUTStdout(IOBuffer):
     """
-    Redirect stdout data to UI events.
+    Redirect stdout data to UI events. Consecutive writes are buffered and
+    fired as a single event when ``FLUSH_SIZE`` characters are collected,
+    or ``FLUSH_DELAY`` seconds after the first buffered write.
     """
 
+    FLUSH_DELAY = 0.05
+
+    FLUSH_SIZE = 8192
+
     def __init__(self, sut: SUT, is_cmd: bool) -> None:
         self._sut = sut
-        self._is_cmd = is_cmd
+        self._buffer = []
+        self._size = 0
+        self._flush_handle = None
+        self._flush_task = None
+        self._fire = libkirk.events.fire
+        self._emit = self._emit_cmd if is_cmd else self._emit_sut
+
+    def _emit_cmd(self, data: str) -> typing.Coroutine:
+        """
+        Fire the command stdout event.
+        """
+        return self._fire("run_cmd_stdout", data)
+
+    def _emit_sut(self, data: str) -> typing.Coroutine:
+        """
+        Fire the SUT stdout event.
+        """
+        return self._fire("sut_stdout", self._sut.name, data)
 
     async def write(self, data: str) -> None:
-        if self._is_cmd:
-            await libkirk.events.fire("run_cmd_stdout", data)
-        else:
-            await libkirk.events.fire("sut_stdout", self._sut.name, data)
+        self._buffer.append(data)
+        self._size += len(data)
+
+        if self._size >= self.FLUSH_SIZE:
+            await self._flush()
+        elif not self._flush_handle:
+            loop = libkirk.get_event_loop()
+            self._flush_handle = loop.call_later(
+                self.FLUSH_DELAY,
+                self._delayed_flush)
+
+    def _delayed_flush(self) -> None:
+        """
+        Flush the buffer once ``FLUSH_DELAY`` expired.
+        """
+        self._flush_handle = None
+        self._flush_task = libkirk.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        """
+        Fire a single event with all the buffered data.
+        """
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._buffer:
+            return
+
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        self._size = 0
+
+        await self._emit(data)
+
+    async def aclose(self) -> None:
+        """
+        Fire the remaining buffered data, waiting for any delayed flush
+        which is still in progress.
+        """
+        if self._flush_task:
+            task = self._flush_task
+            self._flush_task = None
+            await task
+
+        await self._flush()
 
 
+# pylint: disable=too-many-instance-attributes
 class Session:
     """
     The session runner.
@@ -41,6 +146,9 @@ class Session:
 
     def __init__(self, **kwargs) -> None:
         """
+        On python >= 3.12, session sets ``asyncio.eager_task_factory`` as
+        task factory of the current event loop, unless a custom factory is
+        already in use.
         :param tmpdir: temporary directory
         :type tmpdir: TempDir
         :param framework: testing framework we are using
@@ -65,22 +173,54 @@ class Session:
         self._exec_timeout = kwargs.get("exec_timeout", 3600.0)
         self._stop = False
         self._exec_lock = asyncio.Lock()
-        self._run_lock = asyncio.Lock()
+        self._exec_done = asyncio.Event()
+        self._exec_done.set()
+        self._run_done = asyncio.Event()
+        self._run_done.set()
+        self._log_listener = None
+        self._log_handler = None
+        self._sut_started = False
+        self._stopped_fired = False
 
         if not self._tmpdir:
             raise ValueError("tmpdir is empty")
 
+        self._results_path = None
+        self._debug_path = None
+
+        abspath = self._tmpdir.abspath
+        if abspath:
+            self._results_path = os.path.join(abspath, "results.json")
+            self._debug_path = os.path.join(abspath, "debug.log")
+
         if not self._framework:
             raise ValueError("framework is empty")
 
         if not self._sut:
             raise ValueError("sut is empty")
 
+        # pylint: disable=no-member
+        if sys.version_info >= (3, 12):
+            loop = libkirk.get_event_loop()
+            if not loop.get_task_factory():
+                loop.set_task_factory(asyncio.eager_task_factory)
+
+        self._iobuf_sut = RedirectSUTStdout(self._sut, False)
+        self._iobuf_cmd = RedirectSUTStdout(self._sut, True)
+
         suite_timeout = kwargs.get("suite_timeout", 3600.0)
         workers = kwargs.get("workers", 1)
         force_parallel = kwargs.get("force_parallel", False)
         skip_tests = kwargs.get("skip_tests", None)
 
+        self._setup_debug_log()
+
+        if not self._sut.parallel_execution:
+            self._logger.info(
+                "SUT doesn't support parallel execution. "
+                "Forcing workers=1.")
+            workers = 1
+
         self._scheduler = SuiteScheduler(
             sut=self._sut,
             framework=self._framework,
@@ -90,68 +230,116 @@ class Session:
             skip_tests=skip_tests,
             force_parallel=force_parallel)
 
-        self._setup_debug_log()
-
-        if not self._sut.parallel_execution:
-            self._logger.info(
-                "SUT doesn't support parallel execution. "
-                "Forcing workers=1.")
-            self._workers = 1
-
     def _setup_debug_log(self) -> None:
         """
         Set logging module so we save a log file with debugging information
         inside the temporary path.
         """
-        if not self._tmpdir.abspath:
+        if not self._debug_path:
             return
 
         logger = logging.getLogger()
         logger.setLevel(logging.DEBUG)
 
-        debug_file = os.path.join(self._tmpdir.abspath, "debug.log")
-        handler = logging.FileHandler(debug_file, encoding="utf8")
+        handler = logging.FileHandler(self._debug_path, encoding="utf8")
         handler.setLevel(logging.DEBUG)
 
+        # use epoch time, so records don't need strftime() conversion
         formatter = logging.Formatter(
-            "%(asctime)s - %(name)s:%(lineno)s - %(levelname)s - %(message)s")
+            "%(created).3f - %(name)s:%(lineno)s - "
+            "%(levelname)s - %(message)s")
         handler.setFormatter(formatter)
-        logger.addHandler(handler)
+
+        # file is written by a separate thread, so logging won't block
+        # the event loop
+        records = queue.Queue(-1)
+        self._log_handler = logging.handlers.QueueHandler(records)
+        self._log_listener = logging.handlers.QueueListener(
+            records,
+            handler,
+            respect_handler_level=True)
+
+        self._start_debug_log()
+
+    def _start_debug_log(self) -> None:
+        """
+        Start writing debug log records into the log file.
+        """
+        if not self._log_handler:
+            return
+
+        logger = logging.getLogger()
+        if self._log_handler in logger.handlers:
+            return
+
+        self._log_listener.start()
+        logger.addHandler(self._log_handler)
+
+    def stop_debug_log(self) -> None:
+        """
+        Detach the debug log from the logging module, then write pending
+        records into the log file. It should be called once we are done
+        logging, after session completed. Debug log is attached again on
+        the next ``run()``.
+        """
+        if not self._log_handler:
+            return
+
+        logger = logging.getLogger()
+        if self._log_handler not in logger.handlers:
+            return
+
+        logger.removeHandler(self._log_handler)
+        self._log_listener.stop()
+
+        for handler in self._log_listener.handlers:
+            handler.close()
 
     async def _start_sut(self) -> None:
         """
         Start communicating with SUT.
         """
         await libkirk.events.fire("sut_start", self._sut.name)
-        await self._sut.ensure_communicate(
-            iobuffer=RedirectSUTStdout(self._sut, False))
+
+        # set before communicating, so a partially started SUT
+        # will be stopped as well
+        self._sut_started = True
+
+        try:
+            await self._sut.ensure_communicate(iobuffer=self._iobuf_sut)
+        finally:
+            await self._iobuf_sut.aclose()
 
     async def _stop_sut(self) -> None:
         """
         Stop the SUT.
         """
+        if not self._sut_started:
+            return
+
         if not await self._sut.is_running:
             return
 
         await libkirk.events.fire("sut_stop", self._sut.name)
-        await self._sut.stop(iobuffer=RedirectSUTStdout(self._sut, False))
+
+        try:
+            await self._sut.stop(iobuffer=self._iobuf_sut)
+        finally:
+            await self._iobuf_sut.aclose()
+
+        self._sut_started = False
 
     async def _read_suites(self, suites: list) -> list:
         """
         Read suites and return a list of Suite objects.
         """
-        coros = []
-        for suite in suites:
-            coros.append(self._framework.find_suite(self._sut, suite))
-
-        if not coros:
+        if not suites:
             raise KirkException(f"Can't find suites: {suites}")
 
-        suites_obj = await asyncio.gather(*coros, return_exceptions=True)
+        suites_obj = await _run_tasks([
+            self._framework.find_suite(self._sut, suite) for suite in suites
+        ])
         for suite in suites_obj:
-            if isinstance(suite, Exception):
-                raise suite
-
             if not suite:
                 raise KirkException("Can't find suite objects")
 
@@ -161,27 +349,43 @@ class Session:
         """
         Execute a single command on SUT.
         """
-        async with self._exec_lock:
-            try:
-                await libkirk.events.fire("run_cmd_start", command)
-
-                ret = await asyncio.wait_for(
-                    self._sut.run_command(
-                        command,
-                        iobuffer=RedirectSUTStdout(self._sut, True)),
-                    timeout=self._exec_timeout
-                )
-
-                await libkirk.events.fire(
-                    "run_cmd_stop",
-                    command,
-                    ret["stdout"],
-                    ret["returncode"])
-            except asyncio.TimeoutError:
-                raise KirkException(f"Command timeout: {repr(command)}")
-            except KirkException as err:
-                if not self._stop:
-                    raise err
+        await libkirk.events.fire("run_cmd_start", command)
+
+        try:
+            async with self._exec_lock:
+                self._exec_done.clear()
+                try:
+                    # pylint: disable=no-member
+                    if sys.version_info >= (3, 11):
+                        async with asyncio.timeout(self._exec_timeout):
+                            ret = await self._sut.run_command(
+                                command,
+                                iobuffer=self._iobuf_cmd)
+                    else:
+                        ret = await asyncio.wait_for(
+                            self._sut.run_command(
+                                command,
+                                iobuffer=self._iobuf_cmd),
+                            timeout=self._exec_timeout
+                        )
+                finally:
+                    try:
+                        await self._iobuf_cmd.aclose()
+                    finally:
+                        self._exec_done.set()
+        except asyncio.TimeoutError:
+            raise KirkException(f"Command timeout: {repr(command)}")
+        except KirkException as err:
+            if not self._stop:
+                raise err
+
+            return
+
+        await libkirk.events.fire(
+            "run_cmd_stop",
+            command,
+            ret["stdout"],
+            ret["returncode"])
 
     async def _inner_stop(self) -> None:
         """
@@ -192,6 +396,16 @@ class Session:
 
         await self._stop_sut()
 
+    async def _fire_session_stopped(self) -> None:
+        """
+        Fire the session_stopped event only once per session run.
+        """
+        if self._stopped_fired:
+            return
+
+        self._stopped_fired = True
+        await libkirk.events.fire("session_stopped")
+
     async def stop(self) -> None:
         """
         Stop the current session.
@@ -200,14 +414,68 @@ class Session:
         try:
             await self._inner_stop()
 
-            async with self._run_lock:
-                pass
-
-            async with self._exec_lock:
-                pass
+            await self._run_done.wait()
+            await self._exec_done.wait()
         finally:
-            await libkirk.events.fire("session_stopped")
+            await self._fire_session_stopped()
             self._stop = False
+            self.stop_debug_log()
+
+    async def _inner_run(
+            self,
+            command: str,
+            suites: list,
+            report_path: str) -> None:
+        """
+        Run a new session. Arguments are the same of ``run()``.
+        """
+        await libkirk.events.fire("session_started", self._tmpdir.abspath)
+
+        try:
+            await self._start_sut()
+
+            if command:
+                await self._exec_command(command)
+
+            if suites:
+                suites_obj = await self._read_suites(suites)
+                await self._scheduler.schedule(suites_obj)
+        except asyncio.CancelledError:
+            await self._fire_session_stopped()
+            raise
+        except KirkException as err:
+            if not self._stop:
+                self._logger.exception(err)
+                await libkirk.events.fire("session_error", str(err))
+                raise err
+        finally:
+            try:
+                if self._scheduler.results:
+                    exporter = JSONExporter()
+                    data = await libkirk.to_thread(
+                        exporter.serialize,
+                        self._scheduler.results)
+
+                    paths = []
+                    if self._results_path:
+                        paths.append(self._results_path)
+
+                    if report_path:
+                        paths.append(report_path)
+
+                    await _run_tasks([
+                        exporter.write_file(data, path) for path in paths
+                    ])
+
+                    await libkirk.events.fire(
+                        "session_completed",
+                        self._scheduler.results)
+            except KirkException as err:
+                self._logger.exception(err)
+                await libkirk.events.fire("session_error", str(err))
+                raise err
+            finally:
+                await self._inner_stop()
 
     async def run(
             self,
@@ -223,54 +491,13 @@ class Session:
         :param report_path: JSON report path
         :type report_path: str
         """
-        async with self._run_lock:
-            await libkirk.events.fire("session_started", self._tmpdir.abspath)
-
-            try:
-                await self._start_sut()
+        if not self._run_done.is_set():
+            raise RuntimeError("Session is already running")
 
-                if command:
-                    await self._exec_command(command)
-
-                if suites:
-                    suites_obj = await self._read_suites(suites)
-                    await self._scheduler.schedule(suites_obj)
-            except asyncio.CancelledError:
-                await libkirk.events.fire("session_stopped")
-            except KirkException as err:
-                if not self._stop:
-                    self._logger.exception(err)
-                    await libkirk.events.fire("session_error", str(err))
-                    raise err
-            finally:
-                try:
-                    if self._scheduler.results:
-                        exporter = JSONExporter()
-
-                        tasks = []
-                        tasks.append(
-                            exporter.save_file(
-                                self._scheduler.results,
-                                os.path.join(
-                                    self._tmpdir.abspath,
-                                    "results.json")
-                            ))
-
-                        if report_path:
-                            tasks.append(
-                                exporter.save_file(
-                                    self._scheduler.results,
-                                    report_path
-                                ))
-
-                        await asyncio.gather(*tasks)
-
-                        await libkirk.events.fire(
-                            "session_completed",
-                            self._scheduler.results)
-                except KirkException as err:
-                    self._logger.exception(err)
-                    await libkirk.events.fire("session_error", str(err))
-                    raise err
-                finally:
-                    await self._inner_stop()
+        self._run_done.clear()
+        self._stopped_fired = False
+        self._start_debug_log()
+        try:
+            await self._inner_run(command, suites, report_path)
+        finally:
+            self._run_done.set()
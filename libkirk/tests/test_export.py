@@ -8,6 +8,7 @@ from libkirk.data import Test
 from libkirk.data import Suite
 from libkirk.results import SuiteResults, TestResults
 from libkirk.export import JSONExporter
+from libkirk.export import ExporterError
 
 
 pytestmark = pytest.mark.asyncio
@@ -18,7 +19,7 @@ class TestJSONExporter:
     Test JSONExporter class implementation.
     """
 
-    async def test_save_file_bad_args(self):
+    async def test_save_file_bad_args(self, tmpdir, suite_res):
         """
         Test save_file method with bad arguments.
         """
@@ -31,11 +32,54 @@ class TestJSONExporter:
             await exporter.save_file(None, "")
 
         with pytest.raises(ValueError):
-            await exporter.save_file([0, 1], None)
+            await exporter.save_file(suite_res, None)
 
-    async def test_save_file(self, tmpdir):
+        with pytest.raises(ValueError):
+            await exporter.save_file([0, 1], str(tmpdir / "output.json"))
+
+        output = tmpdir / "exists.json"
+        output.write("")
+
+        with pytest.raises(ExporterError):
+            await exporter.save_file(suite_res, str(output))
+
+    async def test_save_file_sync_bad_args(self, tmpdir, suite_res):
         """
-        Test save_file method.
+        Test save_file_sync method with bad arguments.
+        """
+        exporter = JSONExporter()
+
+        with pytest.raises(ValueError):
+            exporter.save_file_sync(list(), str(tmpdir / "output.json"))
+
+        with pytest.raises(ValueError):
+            exporter.save_file_sync(suite_res, None)
+
+        output = tmpdir / "exists.json"
+        output.write("")
+
+        with pytest.raises(ExporterError):
+            exporter.save_file_sync(suite_res, str(output))
+
+    async def test_write_file_bad_args(self, tmpdir):
+        """
+        Test write_file method with bad arguments.
+        """
+        exporter = JSONExporter()
+
+        with pytest.raises(ValueError):
+            await exporter.write_file(b"{}", None)
+
+        output = tmpdir / "output.json"
+        output.write("")
+
+        with pytest.raises(ExporterError):
+            await exporter.write_file(b"{}", str(output))
+
+    @pytest.fixture
+    def suite_res(self):
+        """
+        Suite results to export.
         """
         # create suite/test metadata objects
         tests = [
@@ -96,6 +140,28 @@ class TestJSONExporter:
                 exec_time=3),
         ]
 
+        yield suite_res
+
+    async def test_write_file(self, tmpdir, suite_res):
+        """
+        Test write_file method with serialized data.
+        """
+        exporter = JSONExporter()
+
+        output_save = tmpdir / "output_save.json"
+        await exporter.save_file(suite_res, str(output_save))
+
+        output_write = tmpdir / "output_write.json"
+        await exporter.write_file(
+            exporter.serialize(suite_res),
+            str(output_write))
+
+        assert output_write.read_binary() == output_save.read_binary()
+
+    async def test_save_file(self, tmpdir, suite_res):
+        """
+        Test save_file method.
+        """
         exporter = JSONExporter()
         tasks = []
 
@@ -5,6 +5,7 @@ import os
 import pwd
 import time
 import json
+import signal
 import pytest
 import libkirk.main
 
@@ -82,6 +83,31 @@ class TestMain:
 
         assert excinfo.value.code == libkirk.main.RC_ERROR
 
+    def test_run_command_interrupt(self, tmpdir):
+        """
+        Test --run-command option when session is interrupted.
+        """
+        temp = tmpdir.mkdir("temp")
+        cmd_args = [
+            "--tmp-dir", str(temp),
+            "--run-command", "echo started && sleep 5"
+        ]
+
+        async def interrupt(_):
+            os.kill(os.getpid(), signal.SIGINT)
+
+        # send the signal from inside the running event loop, once the
+        # command process is running and signal handlers are installed
+        libkirk.events.register("run_cmd_stdout", interrupt)
+
+        try:
+            with pytest.raises(SystemExit) as excinfo:
+                libkirk.main.run(cmd_args=cmd_args)
+        finally:
+            libkirk.events.unregister("run_cmd_stdout")
+
+        assert excinfo.value.code == libkirk.main.RC_INTERRUPT
+
     def test_run_suite(self, tmpdir):
         """
         Test --run-suite option.
@@ -1,10 +1,15 @@
 """
 Unittests for the session module.
 """
+import os
 import json
 import asyncio
+import logging
 import pytest
+import libkirk
+import libkirk.session
 from libkirk.session import Session
+from libkirk.session import RedirectSUTStdout
 from libkirk.tempfile import TempDir
 
 
@@ -19,6 +24,118 @@ async def sut():
     raise NotImplementedError()
 
 
+class DummySUT:
+    """
+    Minimal SUT object, used when SUT communication is not needed.
+    """
+    name = "dummy"
+    parallel_execution = False
+
+
+@pytest.fixture
+def dummy_sut():
+    """
+    A dummy SUT implementation used for testing.
+    """
+    yield DummySUT()
+
+
+class TestRedirectSUTStdout:
+    """
+    Test for RedirectSUTStdout class.
+    """
+
+    @pytest.fixture
+    async def events(self):
+        """
+        Run the events loop and collect ``sut_stdout`` data.
+        """
+        collected = []
+
+        async def sut_stdout(_, data):
+            collected.append(data)
+
+        libkirk.events.register("sut_stdout", sut_stdout)
+        libkirk.create_task(libkirk.events.start())
+
+        yield collected
+
+        await libkirk.events.stop()
+        libkirk.events.reset()
+
+    async def test_write_delay(self, events, dummy_sut):
+        """
+        Test that small writes are fired as a single event.
+        """
+        iobuffer = RedirectSUTStdout(dummy_sut, False)
+        for i in range(10):
+            await iobuffer.write(str(i))
+
+        async def wait_events():
+            while not events:
+                await asyncio.sleep(1e-3)
+
+        await asyncio.wait_for(wait_events(), timeout=5)
+
+        assert events == ["0123456789"]
+
+    async def test_write_size(self, events, dummy_sut):
+        """
+        Test that writes are fired once FLUSH_SIZE is reached.
+        """
+        iobuffer = RedirectSUTStdout(dummy_sut, False)
+        data = "x" * RedirectSUTStdout.FLUSH_SIZE
+
+        await iobuffer.write(data)
+        await iobuffer.write("y")
+        await iobuffer.aclose()
+
+        async def wait_events():
+            while len(events) < 2:
+                await asyncio.sleep(1e-3)
+
+        await asyncio.wait_for(wait_events(), timeout=5)
+
+        assert events == [data, "y"]
+
+
+class TestSessionWorkers:
+    """
+    Test Session workers configuration.
+    """
+
+    async def test_workers_no_parallel(
+            self,
+            tmpdir,
+            dummy_framework,
+            dummy_sut,
+            monkeypatch):
+        """
+        Test that workers are forced to 1 when SUT doesn't support parallel
+        execution.
+        """
+        scheduler_args = {}
+
+        class _DummyScheduler:
+            def __init__(self, **kwargs):
+                scheduler_args.update(kwargs)
+
+        monkeypatch.setattr(
+            libkirk.session,
+            "SuiteScheduler",
+            _DummyScheduler)
+
+        session = Session(
+            tmpdir=TempDir(str(tmpdir)),
+            framework=dummy_framework,
+            sut=dummy_sut,
+            workers=4)
+
+        session.stop_debug_log()
+
+        assert scheduler_args["max_workers"] == 1
+
+
 class _TestSession:
     """
     Test for Session class.
@@ -77,6 +194,18 @@ class _TestSession:
         """
         await session.run(command="test")
 
+    async def test_run_twice(self, session):
+        """
+        Test run method when session is already running.
+        """
+        task = libkirk.create_task(session.run(command="sleep 0.5"))
+        await asyncio.sleep(0.1)
+
+        with pytest.raises(RuntimeError):
+            await session.run(command="test")
+
+        await task
+
     async def test_run_command_stop(self, session):
         """
         Test stop when runnig a command.
@@ -90,6 +219,66 @@ class _TestSession:
             stop()
         ])
 
+    async def test_run_cancel(self, session):
+        """
+        Test run method cancellation. session_stopped must be fired only
+        once, even if stop is called after cancellation.
+        """
+        stopped = []
+
+        async def session_stopped():
+            stopped.append(True)
+
+        libkirk.events.register("session_stopped", session_stopped)
+        libkirk.create_task(libkirk.events.start())
+
+        try:
+            task = libkirk.create_task(session.run(command="sleep 2"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(task, timeout=10)
+
+            await asyncio.wait_for(session.stop(), timeout=30)
+        finally:
+            await libkirk.events.stop()
+            libkirk.events.reset()
+
+        assert len(stopped) == 1
+
+    async def test_debug_log(self, tmpdir, sut, dummy_framework):
+        """
+        Test that debug log contains records logged after run, and that
+        it's detached from the logging module when session stops.
+        """
+        logger = logging.getLogger()
+        handlers_num = len(logger.handlers)
+
+        temp = TempDir(str(tmpdir))
+        session = Session(
+            tmpdir=temp,
+            framework=dummy_framework,
+            sut=sut)
+
+        assert len(logger.handlers) == handlers_num + 1
+
+        try:
+            await session.run(command="test")
+            logging.getLogger("kirk.test").info("Session has completed")
+        finally:
+            await asyncio.wait_for(session.stop(), timeout=30)
+
+        assert len(logger.handlers) == handlers_num
+
+        logging.getLogger("kirk.test").info("Debug log is detached")
+
+        debug_log = os.path.join(temp.abspath, "debug.log")
+        with open(debug_log, "r") as log_file:
+            data = log_file.read()
+            assert "Session has completed" in data
+            assert "Debug log is detached" not in data
+
     async def test_run_skip_tests(self, tmpdir, sut, dummy_framework):
         """
         Test run method when executing suites.